@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Apply a redirects patch written by `update_redirects.py --patch`.
+
+The patch file holds only the changed redirects:
+    {"add": [{"key": ..., "value": ...}], "update": [{"key": ..., "value": ...}]}
+Every entry is upserted by key into redirects.json, so applying the same patch
+twice is a no-op. The result is written sorted by key, in the same layout as
+update_redirects.py.
+
+Standard library only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterator, List, Optional
+
+
+def _load_json(path: str) -> Dict[str, object]:
+    try:
+        with open(path, "rb") as handle:
+            data = json.loads(handle.read())
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Failed to load {path}: {exc}")
+    if not isinstance(data, dict):
+        raise SystemExit(f"Failed to load {path}: expected a JSON object")
+    return data
+
+
+def _iter_redirects_json(redirects: Dict[str, str]) -> Iterator[bytes]:
+    """Yield redirects.json one entry at a time (indent=2, sorted by key)."""
+    if not redirects:
+        yield b'{\n  "data": []\n}'
+        return
+    separator = b'{\n  "data": [\n'
+    for key in sorted(redirects):
+        entry = '    {\n      "key": %s,\n      "value": %s\n    }' % (
+            json.dumps(key, ensure_ascii=False),
+            json.dumps(redirects[key], ensure_ascii=False),
+        )
+        yield separator + entry.encode("utf-8")
+        separator = b",\n"
+    yield b"\n  ]\n}"
+
+
+def _write_atomic(path: str, chunks: Iterator[bytes]) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as handle:
+            handle.writelines(chunks)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    # On POSIX, also fsync the directory so the rename itself is durable.
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(
+            os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY
+        )
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _apply_patch(
+    redirects: Dict[str, str], patch: Dict[str, object]
+) -> Dict[str, int]:
+    stats = {"added": 0, "updated": 0, "unchanged": 0}
+    entries: List[object] = []
+    for section in ("add", "update"):
+        value = patch.get(section, [])
+        if not isinstance(value, list):
+            raise SystemExit(f'Invalid patch: "{section}" must be a list')
+        entries.extend(value)
+
+    for entry in entries:
+        if not isinstance(entry, dict) or "key" not in entry or "value" not in entry:
+            raise SystemExit(f"Invalid patch entry: {entry!r}")
+        key, value = entry["key"], entry["value"]
+        current = redirects.get(key)
+        if current is None:
+            stats["added"] += 1
+        elif current != value:
+            stats["updated"] += 1
+        else:
+            stats["unchanged"] += 1
+        redirects[key] = value
+    return stats
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Apply a redirects patch")
+    parser.add_argument(
+        "patch",
+        nargs="?",
+        default="redirects.patch.json",
+        help="Patch file written by update_redirects.py --patch",
+    )
+    parser.add_argument(
+        "--redirects",
+        default="redirects.json",
+        help="redirects.json file to update",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    if not os.path.isfile(args.patch):
+        print(f"Patch file not found: {args.patch}", file=sys.stderr)
+        return 2
+
+    patch = _load_json(args.patch)
+    redirects: Dict[str, str] = {}
+    if os.path.isfile(args.redirects):
+        data = _load_json(args.redirects)
+        entries = data.get("data", [])
+        if not isinstance(entries, list):
+            raise SystemExit(f'Failed to load {args.redirects}: "data" must be a list')
+        for entry in entries:
+            if not isinstance(entry, dict) or "key" not in entry or "value" not in entry:
+                raise SystemExit(
+                    f"Failed to load {args.redirects}: invalid redirect entry {entry!r}"
+                )
+            redirects.setdefault(entry["key"], entry["value"])
+
+    stats = _apply_patch(redirects, patch)
+    _write_atomic(args.redirects, _iter_redirects_json(redirects))
+
+    print(f"✅ Applied {args.patch} to {args.redirects}")
+    print(f"- added: {stats['added']}")
+    print(f"- updated: {stats['updated']}")
+    print(f"- unchanged: {stats['unchanged']}")
+    print(f"- total redirects: {len(redirects)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Redirect testing tool: validation only.
 
-Standard library only.
+Standard library only; orjson is used to parse redirects.json when installed.
 """
 
 from __future__ import annotations
@@ -9,34 +9,91 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import posixpath
 import sys
 from typing import Dict, List, Optional, Set, Tuple
 from urllib.parse import urlsplit
 
-
-def _ensure_leading_slash(path: str) -> str:
-    if not path.startswith("/"):
-        return f"/{path}"
-    return path
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - depends on the environment
+    from json import loads as _json_loads
 
 
 def _normalize_path(path: str) -> str:
-    path = _ensure_leading_slash(path)
-    if path != "/" and path.endswith("/"):
+    if path[:1] != "/":
+        path = f"/{path}"
+    if path[-1] == "/" and path != "/":
         return path[:-1]
     return path
 
 
+# Characters that make urlsplit() return something other than the input path
+# (besides a leading space/control character or a "//" netloc prefix).
+_URL_SPECIAL_CHARS = frozenset("?#:\t\r\n")
+
+
 def _strip_query_fragment(path: str) -> str:
+    # Plain paths (the common case) come back from urlsplit unchanged, so skip it.
+    if (
+        path[:1] > " "
+        and not path.startswith("//")
+        and _URL_SPECIAL_CHARS.isdisjoint(path)
+    ):
+        return path
     parts = urlsplit(path)
     return parts.path
 
 
+def _site_key(path: str) -> str:
+    """Map a URL path to the site-relative file key used for site lookups.
+
+    Trailing slashes are preserved: "/a/" maps to "a/index.html", "/a.html"
+    to "a.html". Non-canonical paths ("a//b", "a/./b", "a/../b") are
+    normalized like the filesystem would resolve them.
+    """
+    key = path.lstrip("/")
+    if not path or path[-1] == "/":
+        key = f"{key}index.html"
+    if "//" in key or "/." in key or key[:1] == ".":
+        return posixpath.normpath(key)
+    return key
+
+
+def _scan_site_files(site_dir: str) -> Set[str]:
+    """Collect site-relative file keys ("a/b/index.html") under site_dir.
+
+    Uses an explicit os.scandir stack instead of os.walk: DirEntry type checks
+    come from the directory listing itself, so no per-entry stat is needed.
+    Mirrors os.walk defaults: symlinked directories are listed but not
+    followed, and unreadable directories are skipped.
+    """
+    files: Set[str] = set()
+    stack: List[Tuple[str, str]] = [(site_dir, "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.add(f"{prefix}{entry.name}")
+                elif not entry.is_symlink():
+                    stack.append((entry.path, f"{prefix}{entry.name}/"))
+    return files
+
+
 def _load_redirects(path: str) -> List[Tuple[str, str]]:
     try:
-        with open(path, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-    except (OSError, json.JSONDecodeError) as exc:
+        with open(path, "rb") as handle:
+            data = _json_loads(handle.read())
+    except (OSError, ValueError) as exc:
         raise SystemExit(f"Failed to load redirects from {path}: {exc}")
 
     redirects: List[Tuple[str, str]] = []
@@ -74,76 +131,99 @@ def _validate_redirects(
     failures: List[str] = []
     warnings: List[str] = []
 
-    normalized: Dict[str, str] = {}
+    # Static-check failures are collected separately so that duplicate, loop
+    # and chain failures keep being reported first.
+    site_failures: List[str] = []
+    site_dir: Optional[str] = None
+    existing_files: Set[str] = set()
+    if not skip_static_check:
+        site_dir = mkdocs_site_dir
+        if not site_dir:
+            site_failures.append("Site dir is required unless --skip-static-check is set")
+            site_dir = None
+        elif not os.path.isdir(site_dir):
+            site_failures.append(f"Site dir does not exist: {site_dir}")
+            site_dir = None
+        else:
+            # Normalize site_dir to absolute path for consistent comparisons
+            site_dir = os.path.abspath(site_dir)
+            # Pre-scan site directory to avoid repeated os.path.isfile calls.
+            # Files are indexed by their site-relative URL form ("a/b/index.html")
+            # so redirect paths can be probed without rebuilding filesystem paths.
+            # Trade-off: Uses O(M) memory where M = number of files in site_dir.
+            # For typical documentation sites (thousands of files), this is ~1-2 MB.
+            # For extremely large sites, consider targeted os.path.exists checks instead.
+            existing_files = _scan_site_files(site_dir)
+
+    # Single pass over the redirects: each source and target is parsed once,
+    # duplicates are recorded, and the static site checks run inline.
+    normalized: Dict[str, Tuple[str, str]] = {}
     for src, dst in redirects:
-        src_norm = _normalize_path(_strip_query_fragment(src))
-        if src_norm in normalized:
+        src_path = _strip_query_fragment(src)
+        target_parts = urlsplit(dst)
+        target_scheme, target_path = target_parts.scheme, target_parts.path
+        target = (target_scheme, target_path)
+        src_norm = _normalize_path(src_path)
+        if normalized.setdefault(src_norm, target) is not target:
             failures.append(f"Duplicate redirect from {src_norm}")
+
+        if not site_dir:
             continue
-        normalized[src_norm] = dst
+
+        # The redirect target must exist in the built site.
+        if not target_scheme:
+            if target_path.endswith(("/", ".html")):
+                key = _site_key(target_path)
+                if key not in existing_files:
+                    candidate = os.path.normpath(os.path.join(site_dir, key))
+                    site_failures.append(f"Missing target file: {candidate}")
+            else:
+                warnings.append(f"Target without trailing slash or .html: {target_path}")
+
+        # The redirect source must NOT exist in the site (would be a conflict).
+        key = _site_key(src_path)
+        if key in existing_files:
+            candidate = os.path.normpath(os.path.join(site_dir, key))
+            site_failures.append(f"Redirect source exists as file (conflict): {candidate}")
 
     next_map: Dict[str, Optional[str]] = {}
-    for src, dst in normalized.items():
-        target_parts = urlsplit(dst)
-        if target_parts.scheme:
+    for src, (target_scheme, target_path) in normalized.items():
+        if target_scheme:
             next_map[src] = None
             continue
-        target_path = _normalize_path(target_parts.path)
+        target_path = _normalize_path(target_path)
         next_map[src] = target_path if target_path in normalized else None
 
-    state: Dict[str, int] = {}
+    # next_map is a functional graph (at most one successor per node), so hop
+    # counts and loop membership can be resolved by walking each chain once
+    # and assigning results back along the walked path.
     hop_count: Dict[str, int] = {}
     looped: Dict[str, bool] = {}
 
-    def dfs_iterative(start: str) -> None:
-        stack: List[Tuple[str, bool]] = [(start, False)]
-        while stack:
-            node, expanded = stack.pop()
-            node_state = state.get(node, 0)
-            if not expanded:
-                if node_state == 2:
-                    continue
-                if node_state == 1:
-                    looped[node] = True
-                    hop_count[node] = 0
-                    state[node] = 2
-                    continue
-                state[node] = 1
-                stack.append((node, True))
-                next_node = next_map.get(node)
-                if next_node and state.get(next_node, 0) != 2:
-                    stack.append((next_node, False))
-            else:
-                # If this node was already finalized as part of a loop
-                # (detected during forward phase), preserve that state
-                if state.get(node, 0) == 2:
-                    continue
+    for start in normalized.keys():
+        if start in hop_count:
+            continue
+        path: List[str] = []
+        on_path: Set[str] = set()
+        node: Optional[str] = start
+        while node is not None and node not in hop_count and node not in on_path:
+            path.append(node)
+            on_path.add(node)
+            node = next_map[node]
+
+        if node is None:
+            # Chain ends at a non-redirected target; the last node is 0 hops.
+            hop, is_loop = -1, False
+        elif node in hop_count:
+            hop, is_loop = hop_count[node], looped[node]
+        else:
+            # Walked back onto the current path: every node on it reaches the loop.
+            hop, is_loop = -1, True
 
-                next_node = next_map.get(node)
-                if not next_node:
-                    hop = 0
-                    is_loop = False
-                else:
-                    next_state = state.get(next_node, 0)
-                    if next_state == 1:
-                        # next_node is still being visited - we're in a cycle
-                        hop = 1
-                        is_loop = True
-                    elif next_state == 2:
-                        # next_node is fully processed
-                        hop = 1 + hop_count.get(next_node, 0)
-                        is_loop = looped.get(next_node, False)
-                    else:
-                        # next_node was never visited (shouldn't happen in valid graph)
-                        hop = 0
-                        is_loop = False
-
-                state[node] = 2
-                hop_count[node] = hop
-                looped[node] = is_loop
-
-    for src in normalized.keys():
-        dfs_iterative(src)
+        for path_node in reversed(path):
+            hop = 0 if is_loop else hop + 1
+            hop_count[path_node] = hop
+            looped[path_node] = is_loop
 
     loops_count = sum(1 for src in normalized.keys() if looped.get(src, False))
     chains_count = sum(
@@ -157,75 +237,7 @@ def _validate_redirects(
     if chains_count:
         failures.append(f"Redirect chains longer than 1 hop: {chains_count}")
 
-    site_dir = mkdocs_site_dir
-    existing_files: Set[str] = set()
-    if not skip_static_check:
-        if not site_dir:
-            failures.append("Site dir is required unless --skip-static-check is set")
-            site_dir = None
-        elif not os.path.isdir(site_dir):
-            failures.append(f"Site dir does not exist: {site_dir}")
-            site_dir = None
-        else:
-            # Normalize site_dir to absolute path for consistent comparisons
-            site_dir = os.path.abspath(site_dir)
-            # Pre-scan site directory to avoid repeated os.path.isfile calls.
-            # Trade-off: Uses O(M) memory where M = number of files in site_dir.
-            # For typical documentation sites (thousands of files), this is ~1-2 MB.
-            # For extremely large sites, consider targeted os.path.exists checks instead.
-            for root, _, files in os.walk(site_dir):
-                for filename in files:
-                    full_path = os.path.normpath(os.path.join(root, filename))
-                    existing_files.add(full_path)
-
-    def check_target(path: str) -> None:
-        target_parts = urlsplit(path)
-        if target_parts.scheme:
-            return
-        target_path = target_parts.path
-
-        if not site_dir:
-            return
-
-        if target_path.endswith("/"):
-            candidate = os.path.normpath(
-                os.path.join(site_dir, target_path.lstrip("/"), "index.html")
-            )
-            if candidate not in existing_files:
-                failures.append(f"Missing target file: {candidate}")
-        elif target_path.endswith(".html"):
-            candidate = os.path.normpath(
-                os.path.join(site_dir, target_path.lstrip("/"))
-            )
-            if candidate not in existing_files:
-                failures.append(f"Missing target file: {candidate}")
-        else:
-            warnings.append(f"Target without trailing slash or .html: {target_path}")
-
-    def check_source_not_exists(path: str) -> None:
-        """Verify that the redirect source does NOT exist in site (would be a conflict)."""
-        if not site_dir:
-            return
-
-        # Use _ensure_leading_slash (not _normalize_path) to preserve trailing slash
-        source_path = _ensure_leading_slash(urlsplit(path).path)
-        
-        if source_path.endswith("/"):
-            candidate = os.path.normpath(
-                os.path.join(site_dir, source_path.lstrip("/"), "index.html")
-            )
-        else:
-            candidate = os.path.normpath(
-                os.path.join(site_dir, source_path.lstrip("/"))
-            )
-
-        if candidate in existing_files:
-            failures.append(f"Redirect source exists as file (conflict): {candidate}")
-
-    if not skip_static_check:
-        for src, dst in redirects:
-            check_target(dst)
-            check_source_not_exists(src)
+    failures.extend(site_failures)
 
     report = {
         "failures": failures,
@@ -1,8 +1,8 @@
 """
 Update Redirects Script
 
-Automatically updates the `redirects.json` file based on changes in a pull request.
-Analyzes PR changes to maintain proper URL redirects when documentation files are
+Automatically updates the `redirects.json` file based on changes in one or more
+pull requests. Analyzes PR changes to maintain proper URL redirects when documentation files are
 moved or removed.
 
 Behavior:
@@ -13,15 +13,23 @@ Behavior:
 **Run this command from the `*-mkdocs` directory where `redirects.json` is located.**
 
 Usage:
-    python utility_scripts/update_redirects.py <PR_NUMBER> <OWNER> <REPO>
+    python utility_scripts/update_redirects.py [--patch] <PR_NUMBER> [<PR_NUMBER> ...] <OWNER> <REPO>
 
 Arguments:
-    PR_NUMBER    Pull request number to analyze
+    PR_NUMBER    Pull request number(s) to analyze; multiple PRs are applied in
+                 the given order with a single load/save of `redirects.json`
     OWNER        GitHub repository owner/organization
     REPO         GitHub repository name
 
+Options:
+    --patch      Leave `redirects.json` untouched and write only the added and
+                 updated redirects to `redirects.patch.json`
+                 ({"add": [...], "update": [...]}). Apply it later with
+                 `utility_scripts/apply_redirects_patch.py`.
+
 Example:
     python utility_scripts/update_redirects.py 42 polkadot-developers polkadot-docs
+    python utility_scripts/update_redirects.py 42 43 47 polkadot-developers polkadot-docs
 
 Remote usage:
     python3 <(curl -s https://raw.githubusercontent.com/papermoonio/workflows/main/utility_scripts/update_redirects.py) 42 polkadot-developers polkadot-docs
@@ -33,106 +41,322 @@ Create an alias:
 Alias usage:
     update_redirects 42 polkadot-developers polkadot-docs
 
+Authentication:
+    Set GITHUB_TOKEN to authenticate GitHub API requests (raises the rate limit
+    from 60 to 5000 requests/hour and allows access to private repositories).
+
 Features:
 - Automatic redirect generation for renamed and removed files
 - Ignores images, js, scripts, run folders and hidden files
 - Updates existing redirects pointing to changed files
+- Caches PR file listings under ~/.cache/update_redirects/ and revalidates them
+  with ETags, so repeated runs on an unchanged PR only spend rate limit on the
+  first page (always fetched fresh to learn the current page count)
 - Provides detailed statistics and feedback
 """
 
 import json
+import os
 import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
 import requests
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
 REDIRECTS_FILE = "redirects.json"
+PATCH_FILE = "redirects.patch.json"
 IGNORED_FOLDERS = {"images", "js", "scripts", "run"}
+IGNORED_PREFIXES = tuple(f"{folder}/" for folder in IGNORED_FOLDERS)
+WATCHED_STATUSES = frozenset({"removed", "renamed"})
+REQUEST_TIMEOUT = 30
+# Concurrent page fetches; keep at or below requests' default connection pool
+# size (requests.adapters.DEFAULT_POOLSIZE == 10) so every worker reuses a
+# pooled keep-alive connection.
+MAX_FETCH_WORKERS = 8
+CACHE_DIR = Path.home() / ".cache" / "update_redirects"
+
+
+def create_session() -> requests.Session:
+    """Create a GitHub API session; reuses connections across paginated requests."""
+    session = requests.Session()
+    session.headers.update({"Accept": "application/vnd.github+json"})
+    token = os.environ.get("GITHUB_TOKEN")
+    if token:
+        session.headers["Authorization"] = f"Bearer {token}"
+    return session
+
+
+_session = create_session()
 
 
 def is_ignored(filepath: str) -> bool:
     """Skip hidden files/folders or certain top-level folders."""
-    parts = filepath.split("/")
-    if any(part.startswith(".") for part in parts):
-        return True
-    if parts[0] in IGNORED_FOLDERS:
-        return True
-    return False
+    return (
+        filepath.startswith(".")
+        or "/." in filepath
+        or filepath.startswith(IGNORED_PREFIXES)
+        or filepath in IGNORED_FOLDERS
+    )
 
 
+@lru_cache(maxsize=4096)
 def format_path(path: str) -> str:
     """Convert a file path into '/path/to/file/' format (remove .md extension, drop 'index')."""
-    path = path.strip()
-    if path.endswith(".md"):
-        path = path[:-3]
-    # If the file is 'index' at the end, drop it
+    path = path.strip().removesuffix(".md")
+    # If the file is 'index' at the end, drop it (the slash goes with the strip below)
     if path.endswith("index"):
-        path = path[: -len("index")].rstrip("/")
-    return "/" + path.strip("/") + "/"
+        path = path[:-5]
+    return f"/{path.strip('/')}/"
+
+
+def json_loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def json_dumps(data) -> bytes:
+    """Serialize with 2-space indentation; both backends emit identical bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
 
 
 def load_redirects():
+    """
+    Load redirects.json as an index for O(1) lookups:
+    - by_key: redirect key -> value
+    - by_value: redirect value -> set of keys pointing to it
+    """
+    data = {"data": []}
     if Path(REDIRECTS_FILE).exists():
-        with open(REDIRECTS_FILE, "r") as f:
-            return json.load(f)
-    return {"data": []}
+        data = json_loads(Path(REDIRECTS_FILE).read_bytes())
+
+    by_key = {}
+    by_value = defaultdict(set)
+    for redirect in data["data"]:
+        key, value = redirect["key"], redirect["value"]
+        if key in by_key:
+            continue  # first entry wins, as with the previous linear lookup
+        by_key[key] = value
+        by_value[value].add(key)
+    return {"by_key": by_key, "by_value": by_value}
 
 
-def save_redirects(data):
-    data["data"].sort(key=lambda r: r["key"])
-    with open(REDIRECTS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+def iter_redirects_json(by_key):
+    """
+    Yield redirects.json as byte chunks, one redirect at a time, so the whole
+    document is never built in memory. Layout matches json_dumps (indent=2).
+    """
+    if not by_key:
+        yield b'{\n  "data": []\n}'
+        return
+    separator = b'{\n  "data": [\n'
+    # by_key keeps the (already sorted) file order with new keys appended, so
+    # this is a near-linear Timsort merge rather than a full O(N log N) sort.
+    # Keys are unique, so sorting the plain strings avoids tuple comparisons.
+    for key in sorted(by_key):
+        yield b'%s    {\n      "key": %s,\n      "value": %s\n    }' % (
+            separator,
+            json_dumps(key),
+            json_dumps(by_key[key]),
+        )
+        separator = b",\n"
+    yield b"\n  ]\n}"
+
+
+def write_file_atomic(path: str, chunks):
+    """
+    Write byte chunks to a temporary file in the same directory and atomically
+    swap it in, so an interrupted run never leaves a truncated file behind.
+    """
+    # The PID keeps concurrent invocations from sharing a temporary file.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.writelines(chunks)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    # On POSIX, also fsync the directory so the rename itself is durable.
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(
+            os.path.dirname(os.path.abspath(path)),
+            os.O_RDONLY | os.O_DIRECTORY,
+        )
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def save_redirects(redirects):
+    write_file_atomic(REDIRECTS_FILE, iter_redirects_json(redirects["by_key"]))
+
+
+def save_patch(by_key, added_keys, updated_keys):
+    """Write only the added/updated redirects (with their final values) to PATCH_FILE."""
+    patch = {
+        "add": [{"key": key, "value": by_key[key]} for key in sorted(added_keys)],
+        "update": [
+            {"key": key, "value": by_key[key]}
+            for key in sorted(updated_keys - added_keys)
+        ],
+    }
+    write_file_atomic(PATCH_FILE, [json_dumps(patch)])
+
+
+def fetch_page(url: str, page: int, cache_path: Optional[Path]):
+    """
+    Fetch one page of PR files. With a cache_path, a cached copy is revalidated
+    with its ETag; GitHub answers 304 (no body, no rate-limit charge) if the
+    page is unchanged. Returns the page's removed/renamed files (reduced to the
+    fields used by process_pr) and the Link header of this response
+    ({rel: {"url": ...}}, empty if absent). Links are never replayed from the
+    cache: an ETag only vouches for the page body, not for the page count.
+    """
+    headers = {}
+    cached = None
+    if cache_path is not None:
+        try:
+            entry = json.loads(cache_path.read_text())
+            cached = entry["body"]
+            headers["If-None-Match"] = entry["etag"]
+        except (OSError, ValueError, KeyError, TypeError):
+            cached = None
+
+    resp = _session.get(
+        url,
+        params={"page": page, "per_page": 100},
+        headers=headers,
+        timeout=REQUEST_TIMEOUT,
+    )
+    if resp.status_code == 304 and cached is not None:
+        return cached, resp.links
+    resp.raise_for_status()
+    # Keep only what process_pr needs; full entries carry the diff patch.
+    data = [
+        {
+            "status": f["status"],
+            "filename": f["filename"],
+            "previous_filename": f.get("previous_filename"),
+        }
+        for f in resp.json()
+        if f["status"] in WATCHED_STATUSES
+    ]
+    links = resp.links
+
+    etag = resp.headers.get("ETag")
+    if cache_path is not None and etag:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps({"etag": etag, "body": data}))
+        except OSError:
+            pass  # caching is best-effort
+    return data, links
 
 
 def fetch_pr_files(owner: str, repo: str, pr_number: str):
+    """
+    Fetch all files of a PR. Page 1 is fetched first to learn the page count
+    from its rel="last" link; remaining pages are then fetched concurrently.
+    Page 1 always bypasses the ETag cache: a 304 for it would not prove that
+    the PR still has the same number of pages.
+    """
     url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}/files"
-    files = []
-    page = 1
-
-    while True:
-        resp = requests.get(url, params={"page": page, "per_page": 100})
-        resp.raise_for_status()
-        data = resp.json()
-        if not data:
-            break
-        files.extend(data)
-        page += 1
+    cache_dir = CACHE_DIR / owner / repo
+
+    def fetch(page: int):
+        return fetch_page(url, page, cache_dir / f"pr{pr_number}_page{page}.json")
+
+    data, links = fetch_page(url, 1, None)
+    files = list(data)
+    # GitHub sends rel="last" together with rel="next"; without it, page 1
+    # was the only page.
+    last = links.get("last")
+    if last is None:
+        return files
+
+    last_page = int(parse_qs(urlsplit(last["url"]).query)["page"][0])
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+        # map() yields results in page order regardless of completion order
+        for data, _ in executor.map(fetch, range(2, last_page + 1)):
+            files.extend(data)
     return files
 
 
-def add_redirect(existing, key, value):
+def apply_change(by_key, by_value, key, value):
     """
-    Add or update a redirect:
+    Redirect `key` (a removed/renamed page) to `value`:
+    - Existing redirects pointing to `key` are updated to point to `value`.
     - If the exact key/value exists, skip.
     - If the key exists but value differs, update value.
     - If key does not exist, add new entry.
+    Returns (keys of modified redirects, whether a new redirect was added).
+    """
+    modified = []
+    # Usually nothing points to the changed page: a single failed lookup.
+    repointed = by_value.pop(key, None)
+    if repointed:
+        by_key.update(dict.fromkeys(repointed, value))
+        by_value[value].update(repointed)
+        modified.extend(repointed)
+
+    current = by_key.get(key)
+    if current is None:
+        by_key[key] = value
+        by_value[value].add(key)
+        return modified, True
+    if current != value:
+        by_key[key] = value  # update to new value
+        by_value[current].discard(key)
+        by_value[value].add(key)
+        modified.append(key)
+    return modified, False
+
+
+def process_pr(owner: str, repo: str, pr_number: str, patch: bool = False):
+    process_prs(owner, repo, [pr_number], patch)
+
+
+def process_prs(owner: str, repo: str, pr_numbers, patch: bool = False):
     """
-    for redirect in existing:
-        if redirect["key"] == key:
-            if redirect["value"] != value:
-                redirect["value"] = value  # update to new value
-                return "updated"
-            return "skipped"  # exact pair already exists
-    existing.append({"key": key, "value": value})
-    return "added"
-
-
-def process_pr(owner: str, repo: str, pr_number: str):
-    pr_files = fetch_pr_files(owner, repo, pr_number)
+    Update redirects for one or more PRs, applying changes in the given PR
+    order. redirects.json is loaded and saved once for the whole batch.
+    With patch=True, only the changes are written, to PATCH_FILE.
+    """
+    # PRs are fetched one after another: fetch_pr_files already fetches pages
+    # concurrently, and nesting another pool would exceed the session's
+    # connection pool (and invite GitHub's secondary rate limits).
+    pr_files = [f for n in pr_numbers for f in fetch_pr_files(owner, repo, n)]
     redirects = load_redirects()
-    existing = redirects["data"]
+    by_key = redirects["by_key"]
+    by_value = redirects["by_value"]
 
-    original_count = len(existing)
+    original_count = len(by_key)
     modified_count = 0
     added_count = 0
     added_redirects = []
+    updated_keys = set()
 
     for f in pr_files:
-        status = f.get("status")
-        old_path = f.get("previous_filename")
-        new_path = f.get("filename")
-
-        if status not in {"removed", "renamed"}:
+        status = f["status"]
+        if status not in WATCHED_STATUSES:
             continue  # only care about removed/renamed
+        old_path = f.get("previous_filename")
+        new_path = f["filename"]
 
         # Skip ignored files
         if new_path and is_ignored(new_path):
@@ -141,56 +365,63 @@ def process_pr(owner: str, repo: str, pr_number: str):
             continue
 
         if status == "removed":
-            formatted = format_path(new_path)
-            for redirect in existing:
-                if redirect["value"] == formatted:
-                    redirect["value"] = "TODO: UPDATE_ME"
-                    modified_count += 1
-            result = add_redirect(existing, formatted, "TODO: UPDATE_ME")
-            if result == "added":
-                added_redirects.append({"key": formatted, "value": "TODO: UPDATE_ME"})
-                added_count += 1
-            elif result == "updated":
-                modified_count += 1
-
-        elif status == "renamed":
+            key, value = format_path(new_path), "TODO: UPDATE_ME"
+        else:
             # Apply format_path to both old and new paths, handles index.md as well
-            formatted_old = format_path(old_path)
-            formatted_new = format_path(new_path)
-            for redirect in existing:
-                if redirect["value"] == formatted_old:
-                    redirect["value"] = formatted_new
-                    modified_count += 1
-            result = add_redirect(existing, formatted_old, formatted_new)
-            if result == "added":
-                added_redirects.append({"key": formatted_old, "value": formatted_new})
-                added_count += 1
-            elif result == "updated":
-                modified_count += 1
-
-    save_redirects(redirects)
-
-    print(f"✅ Redirects updated for PR #{pr_number} in repo {owner}/{repo}")
-
-    print(f"\n🔢 Stats:")
-    print(f"Original redirects: {original_count}")
-    print(f"Redirects modified: {modified_count}")
-    print(f"Redirects added: {added_count}")
-    print(f"Total redirects now: {len(redirects['data'])}")
-
+            key, value = format_path(old_path), format_path(new_path)
+
+        modified, added = apply_change(by_key, by_value, key, value)
+        modified_count += len(modified)
+        updated_keys.update(modified)
+        if added:
+            added_redirects.append({"key": key, "value": value})
+            added_count += 1
+
+    prs = ", ".join(f"#{n}" for n in pr_numbers)
+    label = "PR" if len(pr_numbers) == 1 else "PRs"
+    if patch:
+        added_keys = {r["key"] for r in added_redirects}
+        save_patch(by_key, added_keys, updated_keys)
+        header = (
+            f"✅ Redirect changes for {label} {prs} in repo {owner}/{repo} "
+            f"written to {PATCH_FILE}"
+        )
+    else:
+        save_redirects(redirects)
+        header = f"✅ Redirects updated for {label} {prs} in repo {owner}/{repo}"
+
+    # Build the whole summary and write it once instead of one print per line.
+    lines = [
+        header,
+        "",
+        "🔢 Stats:",
+        f"Original redirects: {original_count}",
+        f"Redirects modified: {modified_count}",
+        f"Redirects added: {added_count}",
+        f"Total redirects after applying the patch: {len(by_key)}"
+        if patch
+        else f"Total redirects now: {len(by_key)}",
+    ]
     if added_count > 0:
-        print("\n⚠️ Redirects that need attention:")
-        for r in added_redirects:
-            print(f"key: {r['key']}, value: {r['value']}")
+        lines += ["", "⚠️ Redirects that need attention:"]
+        lines.extend(f"key: {r['key']}, value: {r['value']}" for r in added_redirects)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print("Usage: python scripts/update_redirects.py <PR_NUMBER> <OWNER> <REPO>")
+    args = sys.argv[1:]
+    patch = "--patch" in args
+    if patch:
+        args.remove("--patch")
+    if len(args) < 3:
+        print(
+            "Usage: python scripts/update_redirects.py [--patch] "
+            "<PR_NUMBER> [<PR_NUMBER> ...] <OWNER> <REPO>"
+        )
         sys.exit(1)
 
-    pr_number = sys.argv[1]
-    owner = sys.argv[2]
-    repo = sys.argv[3]
+    pr_numbers = args[:-2]
+    owner = args[-2]
+    repo = args[-1]
 
-    process_pr(owner, repo, pr_number)
+    process_prs(owner, repo, pr_numbers, patch)